@@ -5,9 +5,12 @@ from fastapi.templating import Jinja2Templates
 import uvicorn
 import json
 import asyncio
+import logging
 import os
 from voice_chat import VoiceChat
 
+log = logging.getLogger(__name__)
+
 app = FastAPI()
 
 # Get the directory where server.py is located
@@ -30,22 +33,37 @@ async def handle_offer(request: Request):
     sdp = data.get("sdp")
     input_device_id = data.get("input_device_id")
     output_device_id = data.get("output_device_id")
-    
+
     if not sdp:
         return JSONResponse({"error": "No SDP provided"}, status_code=400)
-    
+
+    # Normalize to the dict description form handle_offer expects
+    offer = {"sdp": sdp, "type": data.get("type", "offer")}
+
     try:
         # Create a new voice chat session
         voice_chat = VoiceChat()
         active_sessions[id(voice_chat)] = voice_chat
-        
+
         # Handle the WebRTC offer with device preferences
-        answer = await voice_chat.handle_offer(sdp, input_device_id, output_device_id)
+        answer = await voice_chat.handle_offer(offer, input_device_id, output_device_id)
         
         return JSONResponse(answer)
     except Exception as e:
-        print(f"Error handling offer: {e}")
+        log.error(f"Error handling offer: {e}")
         return JSONResponse({"error": str(e)}, status_code=500)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="localhost", port=8000) 
\ No newline at end of file
+    import sys
+
+    # uvloop + httptools keep event-loop latency low for the audio path;
+    # access logging is off so per-request logging never blocks it
+    uvicorn.run(
+        app,
+        host="localhost",
+        port=8000,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        access_log=False,
+        log_level="warning"
+    )
\ No newline at end of file
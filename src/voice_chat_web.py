@@ -0,0 +1,167 @@
+"""Standalone web interface for device selection.
+
+Kept separate from voice_chat so importing VoiceChat as a library (e.g.
+from the pipecat pipeline) never pays the FastAPI/uvicorn import cost;
+this module is only loaded for `voice_chat.py --standalone`.
+"""
+
+import asyncio
+import gzip
+import logging
+import sys
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, ORJSONResponse
+
+from voice_chat import (
+    VoiceChat,
+    create_device_selection_html,
+    get_audio_devices,
+    invalidate_device_cache,
+)
+
+log = logging.getLogger(__name__)
+
+
+def create_app():
+    """Build the FastAPI app for the device-selection interface"""
+    # orjson serializes the JSON endpoints without touching stdlib json
+    app = FastAPI(
+        title="Voice Chat - Device Selection",
+        default_response_class=ORJSONResponse,
+    )
+
+    # Singleton voice chat lives on app.state instead of a module
+    # global; the lock serializes concurrent start requests
+    app.state.voice_chat = None
+    app.state.vc_lock = asyncio.Lock()
+
+    # Set whenever the OS reports an audio device change
+    device_change_event = asyncio.Event()
+
+    async def watch_device_changes():
+        """Watch for OS-level audio device changes (Linux only for now)"""
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "pactl", "subscribe",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            while True:
+                line = await proc.stdout.readline()
+                if not line:
+                    break
+                if b"source" in line or b"sink" in line:
+                    # The cached list is stale the moment the OS reports
+                    # a change; drop it before waking the websocket
+                    invalidate_device_cache()
+                    device_change_event.set()
+        except Exception as e:
+            log.error(f"Device change watcher stopped: {e}")
+
+    @app.on_event("startup")
+    async def start_device_watcher():
+        asyncio.create_task(watch_device_changes())
+
+    # The page is static; render, encode and gzip it once so each GET
+    # only hands uvicorn prebuilt bytes
+    html_cache = create_device_selection_html().encode("utf-8")
+    html_cache_gz = gzip.compress(html_cache, 9)
+
+    @app.get("/", response_class=HTMLResponse)
+    async def root(request: Request):
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return HTMLResponse(
+                content=html_cache_gz,
+                headers={
+                    "Content-Encoding": "gzip",
+                    "Cache-Control": "public, max-age=3600",
+                },
+            )
+        return HTMLResponse(content=html_cache)
+
+    @app.websocket("/ws/devices")
+    async def devices_websocket(websocket: WebSocket):
+        """Push the device list on connect and again on every change"""
+        await websocket.accept()
+        try:
+            while True:
+                # Enumeration forks system tools; keep it off the loop
+                devices = await asyncio.to_thread(get_audio_devices)
+                await websocket.send_json(devices)
+                await device_change_event.wait()
+                device_change_event.clear()
+        except WebSocketDisconnect:
+            pass
+
+    @app.post("/api/start-voice-chat")
+    async def start_voice_chat(request: Request):
+        try:
+            data = await request.json()
+            input_device = data.get("input_device")
+            output_device = data.get("output_device")
+
+            if not input_device or not output_device:
+                return {"success": False, "error": "Both input and output devices are required"}
+
+            # Repeated POSTs must not multiply the background stage
+            # tasks; one pipeline per server
+            async with request.app.state.vc_lock:
+                if request.app.state.voice_chat is not None:
+                    return {"success": False, "error": "Voice chat already running"}
+
+                log.info("🎤 Starting voice chat with web-selected devices:")
+                log.info(f"  Microphone: {input_device['name']}")
+                log.info(f"  Speaker: {output_device['name']}")
+
+                # Create voice chat instance with selected devices
+                voice_chat = VoiceChat(input_device, output_device)
+
+                # Start the persistent pipeline stages in one background task
+                voice_chat._pipeline_task = asyncio.create_task(
+                    voice_chat.start_full_audio_processing()
+                )
+                request.app.state.voice_chat = voice_chat
+
+            log.info("🎯 Voice chat started! You should hear a test response.")
+            log.info("Press Ctrl+C to stop.")
+
+            return {"success": True, "message": "Voice chat started successfully"}
+
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    @app.get("/api/status")
+    async def get_status(request: Request):
+        return {
+            "voice_chat_active": request.app.state.voice_chat is not None,
+            "status": "running"
+        }
+
+    return app
+
+
+def serve():
+    """Run the device-selection web server"""
+    print("🎤 Voice Chat - Web Interface Mode")
+    print("="*50)
+    print("Starting web server for device selection...")
+    print("Open your browser to: http://localhost:8001")
+    print("Select your devices and click 'Start Voice Chat'")
+    print("Press Ctrl+C to stop the server")
+    print("="*50)
+
+    # uvloop + httptools cut socket-I/O jitter on the loop the audio
+    # pipeline shares, and access logging stays off the hot path
+    uvicorn.run(
+        create_app(),
+        host="localhost",
+        port=8001,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        access_log=False,
+        log_level="warning"
+    )
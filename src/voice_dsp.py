@@ -0,0 +1,67 @@
+"""Fused DSP kernels for the hot audio path.
+
+The high-pass filter, the int16 cast and the peak probe are fused into
+a single pass over the window so each sample is read and written once
+instead of once per stage. With Numba installed the kernel is JIT
+compiled (and warm-compiled at import); otherwise a SciPy fallback with
+the same signature is used.
+"""
+
+import numpy as np
+from scipy.signal import sosfilt
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def hp_fused(x, out, sos, zi):
+        """High-pass int16 samples through cascaded biquads in one pass
+
+        Implements the transposed direct form II recurrence sosfilt uses,
+        so ``zi`` (shape ``(n_sections, 2)``, updated in place) is
+        interchangeable with sosfilt state. Writes clipped int16 samples
+        to ``out`` and returns the absolute peak of the filtered signal.
+        """
+        peak = 0.0
+        n_sections = sos.shape[0]
+        for i in range(x.size):
+            v = float(x[i])
+            for s in range(n_sections):
+                y = sos[s, 0] * v + zi[s, 0]
+                zi[s, 0] = sos[s, 1] * v - sos[s, 4] * y + zi[s, 1]
+                zi[s, 1] = sos[s, 2] * v - sos[s, 5] * y
+                v = y
+            if v > 32767.0:
+                v = 32767.0
+            elif v < -32768.0:
+                v = -32768.0
+            out[i] = np.int16(v)
+            av = abs(v)
+            if av > peak:
+                peak = av
+        return peak
+
+    # Warm-compile at import so the JIT cost isn't paid on the first window
+    hp_fused(
+        np.zeros(1, dtype=np.int16),
+        np.zeros(1, dtype=np.int16),
+        np.zeros((1, 6)),
+        np.zeros((1, 2)),
+    )
+else:
+    def hp_fused(x, out, sos, zi):
+        """High-pass int16 samples via sosfilt (NumPy/SciPy fallback)
+
+        Same contract as the JIT kernel: ``zi`` is updated in place,
+        ``out`` receives the clipped int16 result, and the absolute peak
+        of the filtered signal is returned.
+        """
+        filtered, zi_next = sosfilt(sos, x, zi=zi)
+        zi[:] = zi_next
+        peak = float(np.max(np.abs(filtered))) if filtered.size else 0.0
+        np.clip(filtered, -32768.0, 32767.0, out=filtered)
+        out[:] = filtered.astype(np.int16)
+        return peak